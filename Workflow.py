@@ -26,13 +26,12 @@ print(CUBIT_PATH,SPECFEM_PATH,SPECFEM_GEOCUBIT_PATH)
 ### adjust the STL file (model)
 stl_file = './model/Phobos.stl'  # the model stl file that needs to be simulated
 scale_factor = 18.0              # adjust to the size you need 
-(dimensions1, length1, width1, height1),\
-      (dimensions2, length2, width2, height2),new_stl_file = zoom.zoom_stl(stl_file, scale_factor)
+original, scaled = zoom.zoom_stl(stl_file, scale_factor)
 # Print size before and after scaling
-print(f'原始模型尺寸: 长 {dimensions1[0]}, 宽 {dimensions1[1]}, 高 {dimensions1[2]}')
-print(f'原始模型包裹体尺寸: 长 {length2}, 宽 {width2}, 高 {height2}')
-print(f'缩放后模型尺寸: 长 {dimensions2[0]}, 宽 {dimensions2[1]}, 高 {dimensions2[2]}')
-print(f'缩放后模型包裹体尺寸: 长 {length2}, 宽 {width2}, 高 {height2}')
+print(f'原始模型尺寸: 长 {original.dims[0]}, 宽 {original.dims[1]}, 高 {original.dims[2]}')
+print(f'原始模型包裹体尺寸: 长 {original.bbox[0]}, 宽 {original.bbox[1]}, 高 {original.bbox[2]}')
+print(f'缩放后模型尺寸: 长 {scaled.dims[0]}, 宽 {scaled.dims[1]}, 高 {scaled.dims[2]}')
+print(f'缩放后模型包裹体尺寸: 长 {scaled.bbox[0]}, 宽 {scaled.bbox[1]}, 高 {scaled.bbox[2]}')
 
 ### create cubit model and convert mesh 
 mesh_size=40      # mesh size
@@ -48,7 +47,7 @@ rho=2400              # rho (default density consistency)
 gradient=0.0          # velocity gradient
 
 # use the speed of the stl file inclusion to interpolate  
-tomography_model.create_tomography_model(length2, width2, height2, mesh_size, 
+tomography_model.create_tomography_model(*scaled.bbox, mesh_size, 
                              vp_min, vp_max, vs_min, vs_max, rho, gradient)
 
 ### prepare source and station
@@ -65,7 +64,7 @@ write_source_station.write_station(R)
 ### write par_file
 # Control parameter file that needs to be modified
 modifications = {
-        'NPROC': 1,
+        'NPROC': int(os.environ.get('SPECFEM_NPROC', 1)),  # MPI processes, set SPECFEM_NPROC to run in parallel
         'NSTEP': 8000,
         'DT'   : 1.e-4,
         'GPU_MODE': True
@@ -82,7 +81,7 @@ forward.main(SPECFEM_PATH,100,2000,100)
 # ### Visualization
 # # Plot STL files and save plots
 # zoom.plot_stl_3d(stl_file, title='Original STL', save_as=os.path.join('model', 'original_stl.png'))
-# zoom.plot_stl_3d(new_stl_file, title='Scaled STL', save_as=os.path.join('model', 'scaled_stl.png'))
+# zoom.plot_stl_3d(scaled.path, title='Scaled STL', save_as=os.path.join('model', 'scaled_stl.png'))
 # #plot observation
 # plot_observation.main()
 # plot wave from 
@@ -12,14 +12,16 @@
 # Date: September 2024
 #
 # Usage:
-# python script.py <start> <stop> <step>
+# python script.py <start> <stop> <step> [--jobs N]
 # - <start>: The starting iteration for combining VTK files.
 # - <stop>: The ending iteration for combining VTK files.
 # - <step>: The step size between iterations for combining VTK files.
+# - --jobs N: Number of VTK files combined in parallel (default: all CPUs).
 #
 # Dependencies:
 # - SPECfem software with binaries located at <SPECFEM_PATH>.
-# - Python libraries: os, shutil, subprocess, datetime, sys.
+# - Python libraries: os, re, mmap, glob, shutil, subprocess, datetime, argparse,
+#   concurrent.futures.
 #
 # The script performs the following steps:
 # 1. Set up the working environment by creating necessary directories,
@@ -33,10 +35,14 @@
 
 
 import os
+import re
+import mmap
+import glob
 import shutil
 import subprocess
 from datetime import datetime
-import sys
+import argparse
+from concurrent.futures import ThreadPoolExecutor
 
 def run_command(command):
     """ Run a shell command and check for errors. 
@@ -53,31 +59,115 @@ def setup_example(currentdir, software_bin_path, data_dir):
     bin_dir = os.path.join(currentdir, 'bin')
     
     # Setup directory structure
-    os.makedirs(output_dir, exist_ok=True)
     shutil.rmtree(output_dir, ignore_errors=True)
-    os.makedirs(output_dir, exist_ok=True)
+    os.makedirs(output_dir)
 
     # Link executable files
     os.makedirs(bin_dir, exist_ok=True)
-    for f in os.listdir(software_bin_path):
-        if f.startswith('x'):
-            src = os.path.join(software_bin_path, f)
-            dst = os.path.join(bin_dir, f)
-            if os.path.exists(dst):
-                os.remove(dst)
-            os.symlink(src, dst)
+    with os.scandir(software_bin_path) as entries:
+        for entry in entries:
+            if entry.name.startswith('x'):
+                dst = os.path.join(bin_dir, entry.name)
+                try:
+                    os.symlink(entry.path, dst)
+                except FileExistsError:
+                    os.remove(dst)
+                    os.symlink(entry.path, dst)
 
     # Copy configuration files
     shutil.copy(os.path.join(data_dir, 'Par_file'), output_dir)
     shutil.copy(os.path.join(data_dir, 'CMTSOLUTION'), output_dir)
     shutil.copy(os.path.join(data_dir, 'STATIONS'), output_dir)
 
+def read_par_file(par_file, *keys):
+    """ Read the values of the given keys from a Par_file in a single pass.
+    """
+    with open(par_file, 'rb') as f:
+        try:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                text = mm[:].decode()
+        except (ValueError, OSError):
+            # Empty or non-regular file, which cannot be mapped
+            text = f.read().decode()
+    pattern = rf'^\s*({"|".join(map(re.escape, keys))})\s*=\s*([^#\n]+)'
+    values = {key: value.strip() for key, value in re.findall(pattern, text, re.M)}
+    for key in keys:
+        if key not in values:
+            raise KeyError(f"{key} not found in {par_file}")
+    return values
+
+def is_up_to_date(targets, sources):
+    """ Check that all targets exist and are newer than every source file. 
+    """
+    if not all(os.path.exists(t) for t in targets):
+        return False
+    return min(map(os.path.getmtime, targets)) >= max(map(os.path.getmtime, sources), default=0)
+
 def decompose_mesh(NPROC, mesh_dir, base_mpi_dir):
     """ Decompose the mesh. 
     """
     print("\n  Decomposing mesh...\n")
     run_command(f'./bin/xdecompose_mesh {NPROC} {mesh_dir} {base_mpi_dir}')
 
+def command_output(*args):
+    """ Return the combined output of a command, or '' if it cannot be run. 
+    """
+    try:
+        result = subprocess.run(args, capture_output=True, text=True)
+    except OSError:
+        return ''
+    return result.stdout + result.stderr
+
+def physical_cores():
+    """ Count the physical cores this process may run on. Open MPI's PE= 
+    counts physical cores, so SMT siblings are counted once, and the CPU 
+    affinity mask keeps cgroup/SLURM limits. 
+    """
+    if hasattr(os, 'sched_getaffinity'):
+        cpus = os.sched_getaffinity(0)
+    else:
+        cpus = range(os.cpu_count() or 1)
+    cores = set()
+    for cpu in cpus:
+        topology = f'/sys/devices/system/cpu/cpu{cpu}/topology/'
+        try:
+            with open(topology + 'physical_package_id') as package, open(topology + 'core_id') as core:
+                cores.add((package.read().strip(), core.read().strip()))
+        except OSError:
+            cores.add(cpu)
+    return max(1, len(cores))
+
+def has_cuda_ucx():
+    """ Check that Open MPI was built with CUDA support and a UCX PML. 
+    """
+    info = command_output('ompi_info', '--parsable', '--all')
+    return ('_built_with_cuda_support:value:true' in info
+            and 'mca:pml:ucx:' in info)
+
+def mpirun_command(NPROC, executable, gpu_mode=False):
+    """ Build an mpirun command that pins each rank to its own cores. 
+    Binding and UCX options are only added for Open MPI, other MPI 
+    implementations get the plain 'mpirun -np N'. With GPU mode and a 
+    CUDA-aware UCX build, use the UCX layer so device buffers pass between 
+    ranks without host staging; otherwise keep Open MPI's default PML.
+    """
+    cores = physical_cores()
+    threads = max(1, cores // NPROC)
+    env = f'OMP_NUM_THREADS={threads} '
+    if 'libiomp5' in command_output('ldd', executable):
+        # Intel OpenMP runtime
+        env += 'KMP_AFFINITY=granularity=fine,compact '
+
+    flags = ''
+    if 'Open MPI' in command_output('mpirun', '--version'):
+        if NPROC <= cores:
+            flags = f'--map-by ppr:{NPROC}:node:PE={threads} --bind-to core '
+        if gpu_mode and has_cuda_ucx():
+            # Keep shared memory and loopback so single-node runs still start
+            env += 'UCX_TLS=sm,self,cuda_copy,cuda_ipc,rc '
+            flags += '--mca pml ucx '
+    return f'{env}mpirun -np {NPROC} {flags}{executable}'
+
 def generate_databases(NPROC):
     """ Generate databases. 
     """
@@ -86,9 +176,9 @@ def generate_databases(NPROC):
         run_command('./bin/xgenerate_databases')
     else:
         print(f"\n  Running database generation on {NPROC} processors...\n")
-        run_command(f'mpirun -np {NPROC} ./bin/xgenerate_databases')
+        run_command(mpirun_command(NPROC, './bin/xgenerate_databases'))
 
-def run_solver(NPROC):
+def run_solver(NPROC, gpu_mode=False):
     """ Run the SPECfem solver. 
     """
     if NPROC == 1:
@@ -96,18 +186,36 @@ def run_solver(NPROC):
         run_command('./bin/xspecfem3D')
     else:
         print(f"\n  Running solver on {NPROC} processors...\n")
-        run_command(f'mpirun -np {NPROC} ./bin/xspecfem3D')
+        run_command(mpirun_command(NPROC, './bin/xspecfem3D', gpu_mode))
 
-def combine_vtk(output_dir, start, stop, step):
+def combine_vtk(output_dir, start, stop, step, NPROC=1, jobs=None):
     """ Prepare VTK file of wave field snapshot. 
     """
     output_combine_dir = os.path.join('Visualization', 'wave_field')
     os.makedirs(output_combine_dir, exist_ok=True)
+    databases_dir = os.path.join(output_dir, "DATABASES_MPI")
+    pending = []
     for line in range(start, stop + 1, step):
-        run_command(f'./bin/xcombine_vol_data_vtk 0 0 velocity_Z_it{line:06}\
-             {os.path.join(output_dir, "DATABASES_MPI")} {output_combine_dir} 0')
-
-def main(specfem_path, start, stop, step):
+        # Skip snapshots already combined from the current solver output
+        vtk_file = os.path.join(output_combine_dir, f'velocity_Z_it{line:06}.vtk')
+        sources = glob.glob(os.path.join(databases_dir, f'proc*_velocity_Z_it{line:06}.bin'))
+        if not is_up_to_date([vtk_file], sources):
+            pending.append(f'{line:06}')
+    if not pending:
+        print("\n  VTK snapshots are up to date.\n")
+        return
+
+    # Give each worker a share of the snapshots and run that share as a
+    # single shell loop, instead of one Python subprocess call per snapshot
+    jobs = min(jobs or os.cpu_count() or 1, len(pending))
+    commands = [f'for it in {" ".join(pending[i::jobs])}; do '
+                f'./bin/xcombine_vol_data_vtk 0 {NPROC - 1} velocity_Z_it$it '
+                f'{databases_dir} {output_combine_dir} 0 || exit 1; done'
+                for i in range(jobs)]
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        list(executor.map(run_command, commands))
+
+def main(specfem_path, start, stop, step, jobs=None):
     """ Main workflow for forward modeling. 
     """
     print(f"Running example: {datetime.now()}")
@@ -117,43 +225,31 @@ def main(specfem_path, start, stop, step):
     setup_example(currentdir, software_bin_path, data_dir)
 
     # Get processor count and MPI path
-    base_mpi_dir = None
-    with open(os.path.join(data_dir, 'Par_file')) as f:
-        for line in f:
-            if line.startswith('NPROC') and '#' not in line:
-                NPROC = int(line.split('=')[1].strip())
-            if line.startswith('LOCAL_PATH'):
-                base_mpi_dir = line.split('=')[1].strip()
-
-    if base_mpi_dir:
-        os.makedirs(base_mpi_dir, exist_ok=True)
-    else:
-        print("Error: LOCAL_PATH not found in Par_file.")
-        exit(1)
+    params = read_par_file(os.path.join(data_dir, 'Par_file'), 'NPROC', 'LOCAL_PATH', 'GPU_MODE')
+    NPROC = int(params['NPROC'])
+    gpu_mode = params['GPU_MODE'] == '.true.'
+    base_mpi_dir = params['LOCAL_PATH']
+    os.makedirs(base_mpi_dir, exist_ok=True)
 
     decompose_mesh(NPROC, os.path.join(currentdir, 'MESH'), base_mpi_dir)
     generate_databases(NPROC)
-    run_solver(NPROC)
+    run_solver(NPROC, gpu_mode)
     print(f"\nSee results in directory: {os.path.join(currentdir, 'OUTPUT_FILES')}/")
     print("\nDone")
     print(datetime.now())
 
     # Prepare VTK file of wave field snapshot
-    combine_vtk(os.path.join(currentdir, 'OUTPUT_FILES'), start, stop, step)
+    combine_vtk(os.path.join(currentdir, 'OUTPUT_FILES'), start, stop, step, NPROC, jobs)
 
 if __name__ == "__main__":
     # Read parameters from command-line arguments
-    if len(sys.argv) != 4:
-        print("Usage: python script.py <start> <stop> <step>")
-        exit(1)
-
-    try:
-        start = int(sys.argv[1])
-        stop = int(sys.argv[2])
-        step = int(sys.argv[3])
-    except ValueError:
-        print("Error: All arguments must be integers.")
-        exit(1)
+    parser = argparse.ArgumentParser(description="Forward modeling of the wave field with SPECfem")
+    parser.add_argument('start', type=int, help="Starting iteration for combining VTK files")
+    parser.add_argument('stop', type=int, help="Ending iteration for combining VTK files")
+    parser.add_argument('step', type=int, help="Step size between iterations for combining VTK files")
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help="Number of VTK files combined in parallel (default: number of CPUs)")
+    args = parser.parse_args()
 
     SPECFEM_PATH = '../../../specfem/bin'
-    main(SPECFEM_PATH, start, stop, step)
+    main(SPECFEM_PATH, args.start, args.stop, args.step, args.jobs)
@@ -14,6 +14,8 @@
 import os
 import sys
 import glob
+import shutil
+import hashlib
 
 def find_zoom_stl_file(model_directory):
     """ Find STL file with 'zoom' in the filename
@@ -28,6 +30,19 @@ def find_zoom_stl_file(model_directory):
     else:
         raise FileNotFoundError("No STL file with 'zoom' in the name was found.")
 
+def mesh_cache_dir(stl_file, mesh_size):
+    """ Cache directory of the mesh generated from an STL file and mesh size
+    
+    :param stl_file: Path to the STL file
+    :param mesh_size: Desired size of the mesh
+    :return: Path to the cache directory, keyed by the STL content hash and mesh size
+    """
+    digest = hashlib.blake2b(digest_size=8)
+    with open(stl_file, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return os.path.join('MESH', '.cache', f'{digest.hexdigest()}-{mesh_size}')
+
 def generate_mesh(mesh_size, CUBIT_PATH, SPECFEM_PATH):
     """ Generate mesh using CUBIT and convert files for SPECFEM
     
@@ -39,6 +54,13 @@ def generate_mesh(mesh_size, CUBIT_PATH, SPECFEM_PATH):
     stl_file = find_zoom_stl_file('model')
     print(f"Using STL file: {stl_file}")
 
+    # Reuse a cached mesh when neither the STL file nor the mesh size changed
+    cache_dir = mesh_cache_dir(stl_file, mesh_size)
+    if os.path.isdir(cache_dir):
+        shutil.copytree(cache_dir, 'MESH', dirs_exist_ok=True)
+        print(f"Reusing cached mesh: {cache_dir}")
+        return
+
     # Setup the paths for cubit and specfem
     sys.path.append(CUBIT_PATH)
     sys.path.append(SPECFEM_PATH)
@@ -54,26 +76,29 @@ def generate_mesh(mesh_size, CUBIT_PATH, SPECFEM_PATH):
     # Create a unique directory for mesh files
     os.makedirs('MESH', exist_ok=True)
     
-    # Initialize cubit commands
-    cubit.cmd('set duplicate block elements on')
-    
-    # Import STL file and adjust geometry
-    cubit.cmd(f'import stl "{stl_file}" feature_angle 135.00 Spline merge ')
-    cubit.cmd('merge all')
-    
-    # Generate mesh with specified size
-    cubit.cmd(f'sculpt parallel volume all size {mesh_size}')
-    
-    # Define blocks and attributes
-    cubit.cmd('block 1 add hex in volume 1 ')
-    cubit.cmd('block 1 name "elastic tomography_model.xyz 1" ')
-    cubit.cmd('block 1 attribute count 2')
-    cubit.cmd('block 1 attribute index 1 -1')
-    cubit.cmd('block 1 attribute index 2 2')
-    
-    # Define custom free surface
-    cubit.cmd('skin block 1 make block 1000')
-    cubit.cmd('block 1000 name "free_or_absorbing_surface_file_zmax" ')
+    # Collect cubit commands into one journal so CUBIT runs them in a single call
+    commands = [
+        # Initialize cubit commands
+        'set duplicate block elements on',
+        # Import STL file and adjust geometry
+        f'import stl "{stl_file}" feature_angle 135.00 Spline merge ',
+        'merge all',
+        # Generate mesh with specified size
+        f'sculpt parallel volume all size {mesh_size}',
+        # Define blocks and attributes
+        'block 1 add hex in volume 1 ',
+        'block 1 name "elastic tomography_model.xyz 1" ',
+        'block 1 attribute count 2',
+        'block 1 attribute index 1 -1',
+        'block 1 attribute index 2 2',
+        # Define custom free surface
+        'skin block 1 make block 1000',
+        'block 1000 name "free_or_absorbing_surface_file_zmax" ',
+    ]
+    journal_file = os.path.join('MESH', 'generate_mesh.jou')
+    with open(journal_file, 'w') as f:
+        f.write('\n'.join(commands) + '\n')
+    cubit.cmd(f'playback "{journal_file}"')
     
     # Export to SPECFEM3D
     cubit2specfem3d.export2SPECFEM3D('MESH/')
@@ -81,6 +106,13 @@ def generate_mesh(mesh_size, CUBIT_PATH, SPECFEM_PATH):
     # Save the cubit file
     cubit.cmd(f'save as "MESH/meshing.cub" overwrite')
 
+    # Cache the mesh for later runs with the same inputs; copy to a temporary
+    # directory first so an interrupted copy never looks like a complete cache
+    tmp_dir = cache_dir + '.tmp'
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    shutil.copytree('MESH', tmp_dir, ignore=shutil.ignore_patterns('.cache'))
+    os.rename(tmp_dir, cache_dir)
+
 if __name__ == "__main__":
     # Define paths and parameters
     CUBIT_PATH = '../../../cubit/bin/'
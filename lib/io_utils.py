@@ -0,0 +1,82 @@
+#####################################################################
+#                                                                   
+# This script provides the readers shared by the plotting scripts:
+# source parameters from the CMTSOLUTION file and station 
+# coordinates from the STATIONS file.
+#                                                                   
+# Author: Zhangming at USTC
+# Contact: zm5259@mail.ustc.edu.cn                     
+# Date: September 2024
+#
+#####################################################################
+
+import os
+import numpy as np
+
+def read_parameters(param_file, *param_names):
+    """ Read specified parameters from a parameter file and return their values.
+    
+    :param param_file: Path to the parameter file
+    :param param_names: Names of the parameters to read
+    :return: List of parameter values
+    """
+    params = []
+    
+    if not os.path.isfile(param_file):
+        print(f"Error: {param_file} does not exist.")
+        return params
+    
+    with open(param_file, 'r') as file:
+        for line in file:
+            line = line.strip()
+            if line and not line.startswith('#') and ':' in line:
+                name, value = line.split(':', 1)
+                name = name.strip()
+                value = value.strip()
+                if name in param_names:
+                    try:
+                        params.append(float(value))
+                    except ValueError:
+                        try:
+                            params.append(int(value))
+                        except ValueError:
+                            params.append(value)
+    return params
+
+def read_stations(stations_file):
+    """ Read the station file and return the station coordinates.
+    
+    :param stations_file: Path to the station file
+    :return: List of station coordinates
+    """
+    if not os.path.isfile(stations_file):
+        print(f"Error: {stations_file} does not exist.")
+        return []
+
+    try:
+        coordinates = np.loadtxt(stations_file, usecols=(2, 3, 5), ndmin=2)
+    except ValueError:
+        # Malformed lines: fall back to parsing line by line and skip only the bad ones
+        return _read_stations_by_line(stations_file)
+    return coordinates.tolist()
+
+def _read_stations_by_line(stations_file):
+    """ Read the station file one line at a time, skipping invalid lines.
+    
+    :param stations_file: Path to the station file
+    :return: List of station coordinates
+    """
+    coordinates = []
+    
+    with open(stations_file, 'r') as file:
+        for line in file:
+            parts = line.split()
+            if len(parts) == 6:
+                try:
+                    x = float(parts[2])
+                    y = float(parts[3])
+                    z = float(parts[5])
+                    coordinates.append([x, y, z])
+                except ValueError:
+                    print(f"Error: Invalid coordinate values in line: {line.strip()}")
+    return coordinates
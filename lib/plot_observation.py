@@ -18,61 +18,24 @@ import matplotlib.pyplot as plt
 from stl import mesh
 from mpl_toolkits.mplot3d.art3d import Poly3DCollection
 import glob
-
-def read_parameters(param_file, *param_names):
-    """ Read specified parameters from a parameter file and return their values.
-    
-    :param param_file: Path to the parameter file
-    :param param_names: Names of the parameters to read
-    :return: List of parameter values
-    """
-    params = []
-    
-    if not os.path.isfile(param_file):
-        print(f"Error: {param_file} does not exist.")
-        return params
+try:
+    from lib.io_utils import read_parameters, read_stations
+except ImportError:  # run as a script from inside lib/
+    from io_utils import read_parameters, read_stations
+
+def load_stl_vectors(stl_file):
+    """ Load the triangle vertices of an STL file, cached as <stl>.npy while
+    the cache is newer than the STL file.
     
-    with open(param_file, 'r') as file:
-        for line in file:
-            line = line.strip()
-            if line and not line.startswith('#') and ':' in line:
-                name, value = line.split(':', 1)
-                name = name.strip()
-                value = value.strip()
-                if name in param_names:
-                    try:
-                        params.append(float(value))
-                    except ValueError:
-                        try:
-                            params.append(int(value))
-                        except ValueError:
-                            params.append(value)
-    return params
-
-def read_stations(stations_file):
-    """ Read the station file and return the station coordinates.
-    
-    :param stations_file: Path to the station file
-    :return: List of station coordinates
+    :param stl_file: Path to the STL file
+    :return: Array of triangle vertices with shape (n, 3, 3)
     """
-    coordinates = []
-    
-    if not os.path.isfile(stations_file):
-        print(f"Error: {stations_file} does not exist.")
-        return coordinates
-    
-    with open(stations_file, 'r') as file:
-        for line in file:
-            parts = line.split()
-            if len(parts) == 6:
-                try:
-                    x = float(parts[2])
-                    y = float(parts[3])
-                    z = float(parts[5])
-                    coordinates.append((x, y, z))
-                except ValueError:
-                    print(f"Error: Invalid coordinate values in line: {line.strip()}")
-    return coordinates
+    cache_file = stl_file + '.npy'
+    if os.path.exists(cache_file) and os.path.getmtime(cache_file) >= os.path.getmtime(stl_file):
+        return np.load(cache_file)
+    vectors = mesh.Mesh.from_file(stl_file).vectors
+    np.save(cache_file, vectors)
+    return vectors
 
 def plot_stl_and_stations(stl_file, stations, source):
     """ Plot STL model, stations, and source using matplotlib.
@@ -84,15 +47,14 @@ def plot_stl_and_stations(stl_file, stations, source):
     plt.rcParams['font.sans-serif'] = ['SimHei']
     plt.rcParams['axes.unicode_minus'] = False
 
-    model_mesh = mesh.Mesh.from_file(stl_file)
+    vectors = load_stl_vectors(stl_file)
     fig = plt.figure()
     ax = fig.add_subplot(111, projection='3d')
 
-    for f in model_mesh.vectors:
-        tri = Poly3DCollection([f], alpha=0.5, linewidths=0.5)
-        ax.add_collection3d(tri)
+    ax.add_collection3d(Poly3DCollection(vectors, alpha=0.5, linewidths=0.5))
 
-    scale = model_mesh.vectors.flatten()
+    # Same limits on every axis to keep the model undistorted
+    scale = [vectors.min(), vectors.max()]
     ax.auto_scale_xyz(scale, scale, scale)
 
     ax.scatter(source[0], source[1], source[2], color='r', marker='*', s=100, label='Source')
@@ -10,63 +10,11 @@
 #
 #####################################################################
 
-import os
 import sys
-
-def read_parameters(param_file, *param_names):
-    """ Read specified parameters from a parameter file and return their values.
-    
-    :param param_file: Path to the parameter file
-    :param param_names: Names of the parameters to read
-    :return: List of parameter values
-    """
-    params = []
-
-    if not os.path.isfile(param_file):
-        print(f"Error: {param_file} does not exist.")
-        return params
-
-    with open(param_file, 'r') as file:
-        for line in file:
-            line = line.strip()
-            if line and not line.startswith('#') and ':' in line:
-                name, value = line.split(':', 1)
-                name = name.strip()
-                value = value.strip()
-                if name in param_names:
-                    try:
-                        params.append(float(value))
-                    except ValueError:
-                        try:
-                            params.append(int(value))
-                        except ValueError:
-                            params.append(value)
-    return params
-
-def read_stations(stations_file):
-    """ Read the station file and return the station coordinates.
-    
-    :param stations_file: Path to the station file
-    :return: List of station coordinates
-    """
-    coordinates = []
-    
-    if not os.path.isfile(stations_file):
-        print(f"Error: {stations_file} does not exist.")
-        return coordinates
-    
-    with open(stations_file, 'r') as file:
-        for line in file:
-            parts = line.split()
-            if len(parts) == 6:
-                try:
-                    x = float(parts[2])
-                    y = float(parts[3])
-                    z = float(parts[5])
-                    coordinates.append((x, y, z))
-                except ValueError:
-                    print(f"Error: Invalid coordinate values in line: {line.strip()}")
-    return coordinates
+try:
+    from lib.io_utils import read_parameters, read_stations
+except ImportError:  # run as a script from inside lib/
+    from io_utils import read_parameters, read_stations
 
 # Set CUBIT path and import cubit module
 sys.path.append("/home/zhangming/Software/cubit/bin/")
@@ -88,20 +36,28 @@ if not source:
     sys.exit(1)
 
 # Create source vertex in CUBIT
-cubit.cmd(f'create vertex location {source[0]} {source[1]} {source[2]} color red')
+commands = [f'create vertex location {source[0]} {source[1]} {source[2]} color red']
 
 # Read and plot stations
 stations = read_stations(station_file)
-for station in stations:
-    cubit.cmd(f'create vertex location {station[0]} {station[1]} {station[2]} color black')
+commands += [f'create vertex location {station[0]} {station[1]} {station[2]} color black'
+             for station in stations]
 
 # Import STL model and adjust visualization
-cubit.cmd('import cubit "./MESH/meshing.cub"')
-cubit.cmd('block all visibility off')
-cubit.cmd('Mesh visibility off')
-cubit.cmd('graphics mode wireframe geometry')
-cubit.cmd('hardcopy "./model/receiver_source_1.png" png')
-cubit.cmd('graphics mode transparent geometry')
-cubit.cmd('hardcopy "./model/receiver_source_2.png" png')
+commands += [
+    'import cubit "./MESH/meshing.cub"',
+    'block all visibility off',
+    'Mesh visibility off',
+    'graphics mode wireframe geometry',
+    'hardcopy "./model/receiver_source_1.png" png',
+    'graphics mode transparent geometry',
+    'hardcopy "./model/receiver_source_2.png" png',
+]
+
+# Run all commands as one journal
+journal_file = './model/observation.jou'
+with open(journal_file, 'w') as f:
+    f.write('\n'.join(commands) + '\n')
+cubit.cmd(f'playback "{journal_file}"')
 
 print("Mesh and stations plotted in Cubit.")
@@ -14,8 +14,58 @@
 #####################################################################
 
 import os
+import string
+import itertools
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import numpy as np
 import matplotlib.pyplot as plt
+from matplotlib.collections import LineCollection
+
+# Station name prefixes: AA, AB, ..., ZZ
+_STATION_NAMES = tuple(a + b for a, b in itertools.product(string.ascii_uppercase, repeat=2))
+
+# Reader threads used for every batch of trace loads
+_MAX_WORKERS = 8
+
+def _load_col1(path):
+    """
+    Load the amplitude column of a two-column ASCII trace file as float32.
+    The parsed trace is cached next to the file as ``<path>.npy`` and reused
+    as long as the cache is newer than the trace file.
+
+    :param path: Path to the trace file
+    :return: 1D array of amplitudes
+    """
+    npy = path + '.npy'
+    if os.path.exists(npy) and os.path.getmtime(npy) >= os.path.getmtime(path):
+        return np.load(npy)
+    with open(path, 'rb') as f:
+        # Read-once file: ask for readahead, then let the page cache drop it
+        if hasattr(os, 'posix_fadvise'):
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_WILLNEED)
+        data = np.fromfile(f, dtype=np.float32, sep=' ').reshape(-1, 2)[:, 1].copy()
+        if hasattr(os, 'posix_fadvise'):
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+    np.save(npy, data)
+    return data
+
+def _load_traces(paths, out=None):
+    """
+    Load several trace files concurrently so their reads overlap.
+
+    :param paths: Paths of the trace files
+    :param out: Optional 2D array whose columns are filled in the order of
+                ``paths`` as each read completes
+    :return: ``out`` if given, otherwise a list of 1D amplitude arrays in the order of ``paths``
+    """
+    with ThreadPoolExecutor(max_workers=_MAX_WORKERS) as executor:
+        if out is None:
+            return list(executor.map(_load_col1, paths))
+        futures = {executor.submit(_load_col1, path): i for i, path in enumerate(paths)}
+        for future in as_completed(futures):
+            out[:, futures[future]] = future.result()
+    return out
 
 def plot_seismic_waveform(dt, nt, output_dir="./Visualization/wave_from/"):
     """
@@ -37,33 +87,41 @@ def plot_seismic_waveform(dt, nt, output_dir="./Visualization/wave_from/"):
 
     # Set the file path
     path1 = "./OUTPUT_FILES/"
-    filehead = [chr(i) + chr(j) for i in range(65, 91) for j in range(65, 91)]  # Generate letter combinations
     
-    # Plot the first figure showing waveforms for multiple stations
-    plt.figure()
-    for i in range(72):
-        data_1 = np.loadtxt(path1 + filehead[i] + f'.X{i + 1}.FXZ.semd')
-        # Standardize the data
-        mean_data_1 = np.mean(data_1[:, 1])
-        std_data_1 = np.std(data_1[:, 1])
-        data_1[:, 1] = (data_1[:, 1] - mean_data_1) / std_data_1
-        # Normalize the data
-        max_data_1 = np.max(data_1[:, 1])
-        min_data_1 = np.min(data_1[:, 1])
-        data_1[:, 1] = (data_1[:, 1] - min_data_1) / (max_data_1 - min_data_1)
-        plt.plot(time, data_1[:, 1] + 72 - i, 'k')
-
-    plt.ylim(0, 72)
-    plt.xlim(np.min(time), np.max(time))
-    plt.xlabel("Time (s)", fontsize=12)
-    plt.ylabel("Amplitude", fontsize=12)
-    plt.title('Seismic Waveform Plot', fontsize=15)
-    plt.tight_layout()
-
-    # Save the first figure
-    plot1_path = os.path.join(output_dir, 'waveform_plot.png')
-    plt.savefig(plot1_path, dpi=200)
-    plt.close()
+    # Load all traces into one disk-backed (nt, 72) array, filling columns as reads complete
+    trace_cache = os.path.join(path1, '.trace_cache.dat')
+    traces = np.memmap(trace_cache, dtype=np.float32, mode='w+', shape=(nt, 72))
+    try:
+        _load_traces([path1 + name + f'.X{i + 1}.FXZ.semd'
+                      for i, name in enumerate(_STATION_NAMES[:72])], out=traces)
+        # Normalize the data to [0, 1]; min-max scaling is invariant to the
+        # standardization that used to precede it, so one pass is enough
+        traces -= traces.min(axis=0)
+        traces /= traces.max(axis=0)
+        traces += 72 - np.arange(72, dtype=np.float32)
+
+        # Plot the first figure showing waveforms for multiple stations;
+        # segments are built one trace at a time instead of stacking the whole matrix
+        fig, ax = plt.subplots()
+        lines = LineCollection((np.column_stack((time, traces[:, i])) for i in range(72)),
+                               colors='k', linewidths=0.5)
+        lines.set_rasterized(True)
+        ax.add_collection(lines)
+
+        plt.ylim(0, 72)
+        plt.xlim(np.min(time), np.max(time))
+        plt.xlabel("Time (s)", fontsize=12)
+        plt.ylabel("Amplitude", fontsize=12)
+        plt.title('Seismic Waveform Plot', fontsize=15)
+        plt.tight_layout()
+
+        # Save the first figure
+        plot1_path = os.path.join(output_dir, 'waveform_plot.png')
+        plt.savefig(plot1_path, dpi=200)
+        plt.close()
+    finally:
+        del traces
+        os.remove(trace_cache)
 
     # Data file paths for individual traces
     datapath1 = path1 + 'AA.X1.FXZ.semd'
@@ -72,10 +130,7 @@ def plot_seismic_waveform(dt, nt, output_dir="./Visualization/wave_from/"):
     datapath4 = path1 + 'CC.X55.FXZ.semd'
 
     # Load the data for individual traces
-    data1 = np.loadtxt(datapath1)[:, 1]
-    data2 = np.loadtxt(datapath2)[:, 1]
-    data3 = np.loadtxt(datapath3)[:, 1]
-    data4 = np.loadtxt(datapath4)[:, 1]
+    data1, data2, data3, data4 = _load_traces([datapath1, datapath2, datapath3, datapath4])
 
     # Create a figure with 4 subplots for individual traces
     fig, axs = plt.subplots(nrows=4, ncols=1, figsize=(8, 6))
@@ -15,9 +15,62 @@
 import os
 import math
 import argparse
+import numpy as np
+
+# Size of the output file buffer and of the z-slab tiles formatted per write
+WRITE_BUFFER_SIZE = 8 * 1024 * 1024
+TILE_BYTES = 256 * 1024
+
+def format_rows(rows, fmt='%.7g'):
+    """
+    Format the rows of a 2D array as space-separated text lines.
+    
+    :param rows: 2D array of values
+    :param fmt: Format applied to every value
+    :return: Text with one newline-terminated line per row
+    """
+    # One % over a repeated row template formats the whole block in C
+    line = ' '.join([fmt] * rows.shape[1]) + '\n'
+    return (line * len(rows)) % tuple(rows.ravel().tolist())
+
+def fill_grid(orig_x, orig_y, orig_z, mesh_size, nx, ny, nz, vp_min, vs_min, gradient, rho, out, k0=0,
+              z_only=False):
+    """
+    Fill a preallocated array with the model values of every grid cell.
+    
+    :param orig_x: Origin of the grid in x-direction
+    :param orig_y: Origin of the grid in y-direction
+    :param orig_z: Origin of the grid in z-direction
+    :param mesh_size: Size of each grid cell
+    :param nx: Number of grid points in x-direction
+    :param ny: Number of grid points in y-direction
+    :param nz: Number of grid points in z-direction
+    :param vp_min: Minimum P-wave velocity
+    :param vs_min: Minimum S-wave velocity
+    :param gradient: Gradient of velocity change with depth
+    :param rho: Density of the model
+    :param out: Array of shape (nz, ny, nx, 6) receiving x, y, z, vp, vs, rho
+    :param k0: Index of the first z-slice to fill, for filling the grid in slabs
+    :param z_only: Only update the columns that depend on z, the others already
+                   hold the values of a previous slab
+    """
+    z = orig_z + np.arange(k0, k0 + nz) * mesh_size
+    if not z_only:
+        out[..., 0] = orig_x + np.arange(nx) * mesh_size
+        out[..., 1] = (orig_y + np.arange(ny) * mesh_size)[:, None]
+        out[..., 5] = rho
+    out[..., 2] = z[:, None, None]
+    if gradient == 0:
+        # Constant velocities do not depend on z, fill them once
+        if not z_only:
+            out[..., 3] = vp_min
+            out[..., 4] = vs_min
+    else:
+        out[..., 3] = (vp_min + gradient * z)[:, None, None]
+        out[..., 4] = (vs_min + gradient * z)[:, None, None]
 
 def create_tomography_model(length, width, height, mesh_size, 
-                            vp_min, vp_max, vs_min, vs_max, rho, gradient):
+                            vp_min, vp_max, vs_min, vs_max, rho, gradient, binary=False):
     """
     Create a tomography model for an irregular asteroid and save it to a file.
     
@@ -31,6 +84,8 @@ def create_tomography_model(length, width, height, mesh_size,
     :param vs_max: Maximum S-wave velocity
     :param rho: Density of the model
     :param gradient: Gradient of velocity change with depth
+    :param binary: Write raw float32 values (.f32) with an ASCII header sidecar (.hdr)
+                   instead of the text model read by SPECFEM
     """
     # Calculate origin and endpoint coordinates
     orig_x = -length / 2.0
@@ -51,26 +106,31 @@ def create_tomography_model(length, width, height, mesh_size,
     header += f"{nx} {ny} {nz}\n"
     header += f"{vp_min} {vp_max} {vs_min} {vs_max} {rho} {rho}\n"
 
-    # Create model values
-    model_values = []
-    for k in range(nz):
-        for j in range(ny):
-            for i in range(nx):
-                x = orig_x + i * mesh_size
-                y = orig_y + j * mesh_size
-                z = orig_z + k * mesh_size
-                vp = vp_min + gradient * z
-                vs = vs_min + gradient * z 
-                model_values.append(f"{x} {y} {z} {vp} {vs} {rho}")
-
     # Write to file in DATA/tomo_files/
     tomo_dir = os.path.join('DATA/tomo_files')
     os.makedirs(tomo_dir, exist_ok=True)
     output_file = os.path.join(tomo_dir, 'tomography_model.xyz')
-    
-    with open(output_file, 'w') as f:
-        f.write(header)
-        f.write("\n".join(model_values))
+
+    if binary:
+        # Raw float32 values in a memory-mapped file, header in an ASCII sidecar
+        with open(output_file + '.hdr', 'w') as f:
+            f.write(header)
+        output_file += '.f32'
+        model_values = np.memmap(output_file, dtype=np.float32, mode='w+', shape=(nz, ny, nx, 6))
+        fill_grid(orig_x, orig_y, orig_z, mesh_size, nx, ny, nz, vp_min, vs_min, gradient, rho, model_values)
+        model_values.flush()
+    else:
+        # Create and write model values in z-slab tiles that fit in L2 cache
+        dtype = np.dtype(np.float32)
+        tile_z = max(1, min(nz, TILE_BYTES // (ny * nx * 6 * dtype.itemsize)))
+        tile = np.empty((tile_z, ny, nx, 6), dtype=dtype)
+        with open(output_file, 'w', buffering=WRITE_BUFFER_SIZE) as f:
+            f.write(header)
+            for k0 in range(0, nz, tile_z):
+                model_values = tile[:min(tile_z, nz - k0)]
+                fill_grid(orig_x, orig_y, orig_z, mesh_size, nx, ny, len(model_values),
+                          vp_min, vs_min, gradient, rho, model_values, k0, z_only=k0 > 0)
+                f.write(format_rows(model_values.reshape(-1, 6)))
 
     print(f"Created file: {output_file}")
 
@@ -88,13 +148,14 @@ if __name__ == "__main__":
     parser.add_argument('--vs_max', type=float, default=3000.0, help="Maximum S-wave velocity")
     parser.add_argument('--rho', type=float, default=2500.0, help="Density")
     parser.add_argument('--gradient', type=float, default=0.5, help="Gradient of velocity change with depth")
+    parser.add_argument('--binary', action='store_true', help="Write raw float32 values with an ASCII header sidecar")
     
     args = parser.parse_args()
 
     # Call the function to generate the model
     create_tomography_model(args.length, args.width, args.height, args.mesh_size, 
                             args.vp_min, args.vp_max, args.vs_min, args.vs_max, 
-                            args.rho, args.gradient)
+                            args.rho, args.gradient, args.binary)
 
 # Example command to run the script:
 # python script.py --length 200 --width 200 --height 100 --mesh_size 5
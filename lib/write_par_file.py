@@ -13,9 +13,13 @@
 #
 #####################################################################
 
+import os
 import re
 import sys
 
+# Parameter line: name, equals sign (with surrounding spaces), value
+_PAR_RE = re.compile(r'(\s*\S+)(\s*=\s*)(.*)')
+
 def format_value(value):
     """
     Format the value as a string. If it is a float with more than three decimal places,
@@ -25,11 +29,12 @@ def format_value(value):
     :return: The formatted value as a string
     """
     if isinstance(value, float):
+        fixed = f"{value:.10f}".rstrip('0')
         # If there are more than three decimal places, use scientific notation
-        if len(f"{value:.10f}".rstrip('0').split('.')[-1]) > 3:
+        if len(fixed.split('.')[-1]) > 3:
             return f"{value:.1e}"
         else:
-            return f"{value:.10f}".rstrip('0').rstrip('.')  # Keep trailing zeroes and dot if necessary
+            return fixed.rstrip('.')  # Keep trailing zeroes and dot if necessary
     elif isinstance(value, bool):
         return '.true.' if value else '.false.'
     else:
@@ -42,34 +47,48 @@ def modify_par_file(modifications):
     
     :param modifications: Dictionary of parameter names and their new values
     """
+    if not modifications:
+        return
+
     # Read file content
     with open('./DATA/Par_file', 'r') as file:
         lines = file.readlines()
 
     # Modify the needed parameters
+    names = frozenset(modifications)
+    # Format every new value once, up front
+    new_values = {name: format_value(value) for name, value in modifications.items()}
+    found = set()
     for i, line in enumerate(lines):
+        # Only lines with an equals sign can hold a parameter
+        if '=' not in line:
+            continue
         # Use regex to find parameter name, equals sign, and value after equals sign
-        match = re.match(r'(\s*\S+)(\s*=\s*)(.*)', line)
+        match = _PAR_RE.match(line)
         if match:
             param_name, equal_sign, param_value = match.groups()
             # If parameter name is in the dictionary, update its value
-            if param_name.strip() in modifications:
-                new_value = format_value(modifications[param_name.strip()])
-                # Convert boolean values to .true. or .false.
-                if isinstance(new_value, bool):
-                    new_value = '.true.' if new_value else '.false.'
-                else:
-                    # Convert other types to string
-                    new_value = str(new_value)
+            if param_name.strip() in names:
+                found.add(param_name.strip())
+                new_value = new_values[param_name.strip()]
                 # Update value after equals sign, keeping format intact
                 try:
                     lines[i] = f"{param_name}{equal_sign}{new_value.ljust(len(param_value))}\n"
                 except Exception as e:
                     print(f"Error formatting line {i}: {e}")
+                # Stop once every parameter has been updated
+                if len(found) == len(names):
+                    break
+
+    # Parameters missing from the file are not added, so report them
+    for name in modifications:
+        if name not in found:
+            print(f"Warning: parameter '{name}' not found in './DATA/Par_file', skipped.")
 
-    # Write updated content back to the file
-    with open('./DATA/Par_file', 'w') as file:
-        file.writelines(lines)
+    # Write updated content to a temporary file in one write, then swap it in atomically
+    with open('./DATA/Par_file.tmp', 'w') as file:
+        file.write(''.join(lines))
+    os.replace('./DATA/Par_file.tmp', './DATA/Par_file')
     
     print(f"Parameters in './DATA/Par_file' have been updated.")
 
@@ -17,8 +17,12 @@
 #####################################################################
 
 import os
+import string
 import numpy as np
 
+# Letters of the two-letter receiver names
+LETTERS = np.array(list(string.ascii_uppercase))
+
 def write_source(source, f0, M):
     """
     Create the CMTSOLUTION file with event information.
@@ -40,21 +44,24 @@ def write_source(source, f0, M):
     # Event file path
     event_file = os.path.join(event_dir, 'CMTSOLUTION')
 
-    # Write the event data to the file
+    # Build the event data and write it to the file at once
+    lines = [
+        f'PDE 2024 1 1 1 1 1 {source[1]:>10.6f} {source[0]:>10.6f} {source[2]:>10.6f} 0 0 Asteroid_forward ',
+        'event name:       Asteroid_forward ',
+        'time shift:       0.0000',
+        f'f0:       {f0:>10.6f}',
+        f'latorUTM:       {source[1]:>10.6f}',
+        f'longorUTM:       {source[0]:>10.6f}',
+        f'depth:       {source[2]:>10.6f}',
+        f'Mrr:       {M[0]:>10.6f}',
+        f'Mtt:       {M[1]:>10.6f}',
+        f'Mpp:       {M[2]:>10.6f}',
+        f'Mrt:       {M[3]:>10.6f}',
+        f'Mrp:       {M[4]:>10.6f}',
+        f'Mtp:       {M[5]:>10.6f}',
+    ]
     with open(event_file, 'w') as f:
-        f.write(f'PDE 2024 1 1 1 1 1 {source[1]:>10.6f} {source[0]:>10.6f} {source[2]:>10.6f} 0 0 Asteroid_forward \n')
-        f.write('event name:       Asteroid_forward \n')
-        f.write('time shift:       0.0000\n')
-        f.write(f'f0:       {f0:>10.6f}\n')
-        f.write(f'latorUTM:       {source[1]:>10.6f}\n')
-        f.write(f'longorUTM:       {source[0]:>10.6f}\n')
-        f.write(f'depth:       {source[2]:>10.6f}\n')
-        f.write(f'Mrr:       {M[0]:>10.6f}\n')
-        f.write(f'Mtt:       {M[1]:>10.6f}\n')
-        f.write(f'Mpp:       {M[2]:>10.6f}\n')
-        f.write(f'Mrt:       {M[3]:>10.6f}\n')
-        f.write(f'Mrp:       {M[4]:>10.6f}\n')
-        f.write(f'Mtp:       {M[5]:>10.6f}\n')
+        f.write("\n".join(lines) + "\n")
 
     print(f"Event file created: {event_file}")
 
@@ -70,40 +77,30 @@ def write_station(R, ntr=72, filepath='./DATA/STATIONS'):
     filepath : str, optional
         Output file path (default is './DATA/STATIONS').
     """
-    
-    # Define the angular range
-    phiar = np.arange(0, 361, 5) * np.pi / 180
+    if ntr > len(LETTERS) ** 2:
+        raise ValueError(f"ntr must be at most {len(LETTERS) ** 2} to get unique two-letter receiver names")
+
+    # Generate the coordinates on a circle, 5 degrees apart
+    phir = np.arange(ntr) * 5 * np.pi / 180
     thetar = 0.5 * np.pi
-    xr, yr, zr = [], [], []
-    
-    # Generate the coordinates
-    for i in range(ntr):
-        rr = R
-        phir = phiar[i]
-        xr.append(rr * np.sin(thetar) * np.cos(phir))
-        yr.append(rr * np.sin(thetar) * np.sin(phir))
-        zr.append(0)
-    
-    vecr = np.column_stack([yr, xr, zr])
+    xr = R * np.sin(thetar) * np.cos(phir)
+    yr = R * np.sin(thetar) * np.sin(phir)
+    zr = np.zeros(ntr, dtype=int)
     
-    # Create coordinate list
-    coordinates = []
+    # Generate receiver names (X1, AA), (X2, AB), ...
+    idx = np.arange(ntr)
+    names1 = np.char.add('X', (idx + 1).astype(str))
+    names2 = np.char.add(LETTERS[idx // 26], LETTERS[idx % 26])
     
-    for i in range(ntr):
-        row = []
-        # Generate receiver name
-        char1 = chr(65 + (i // 26))  # First letter (ASCII)
-        char2 = chr(65 + (i % 26))   # Second letter (ASCII)
-        row.append(f'X{i+1}')
-        row.append(f'{char1}{char2}')
-        row.extend([yr[i], xr[i], 0.0, zr[i]])  # x, y, z coordinates
-        
-        coordinates.append(row)
+    # Create coordinate list: names, then x, y, z coordinates
+    coordinates = [
+        [name1, name2, y, x, 0.0, z]
+        for name1, name2, x, y, z in zip(names1.tolist(), names2.tolist(), xr.tolist(), yr.tolist(), zr.tolist())
+    ]
     
     # Write the coordinates to the file
     with open(filepath, "w") as file:
-        for row in coordinates:
-            file.write(" ".join(map(str, row)) + "\n")
+        file.write("".join(" ".join(map(str, row)) + "\n" for row in coordinates))
     
     print(f"Station file written to: {filepath}")
 
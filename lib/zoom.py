@@ -3,8 +3,10 @@ This script processes STL files, allowing for scaling and visualization of 3D mo
 1. `calc_dims`: Calculates the bounding box and dimensions of the STL model.
 2. `scale_model`: Scales the STL model, centers it at the origin, and saves it as a new STL file.
 3. `plot_stl_3d`: Plots the STL file in 3D using matplotlib, with options to display or save the plot.
-4. `zoom_stl`: Combines reading, scaling, and saving the STL file, and records the original and scaled model details to a text file.
-5. `main`: The main program function, which processes a sample STL file (`Phobos.stl`), applies scaling, and visualizes both the original and scaled models.
+4. `zoom_stl`: Combines reading, scaling, and saving the STL file, records the original and scaled model details to a text file,
+   and returns them as `STLDims` (model dimensions, bounding box, file path).
+5. `batch_zoom`: Runs `zoom_stl` over several STL files in parallel worker processes and records all details in one text file.
+6. `main`: The main program function, which processes a sample STL file (`Phobos.stl`), applies scaling, and visualizes both the original and scaled models.
 
 Parameters:
 - `stl_file`: The input STL file path.
@@ -21,43 +23,56 @@ Run the script as a standalone program, or call its functions within another cod
 """
 
 import os
-import math
+from dataclasses import dataclass
+from itertools import repeat
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
 from stl import mesh
 import matplotlib.pyplot as plt
 from mpl_toolkits.mplot3d.art3d import Poly3DCollection
 
+@dataclass
+class STLDims:
+    """ Dimensions of an STL model and of its bounding box 
+    """
+    dims: np.ndarray   # model size (LxWxH)
+    bbox: np.ndarray   # bounding box size (LxWxH)
+    path: str          # STL file path
+
+
 def calc_dims(model_mesh):
     """ Calculate dimensions of the STL file 
     """
     vertices = model_mesh.vectors.reshape(-1, 3)  # extract all vertex coordinates
-    min_coords = np.min(vertices, axis=0)
-    max_coords = np.max(vertices, axis=0)
+    min_coords, max_coords = vertices.min(axis=0), vertices.max(axis=0)
     dimensions = max_coords - min_coords
 
-    # Calculate bounding box dimensions
-    length_width = math.ceil(max(dimensions[0], dimensions[1]) * 1.2 / 10) * 10  # Ensure length and width are the same and rounded to nearest 10
-    height = math.ceil(dimensions[2] * 1.2 / 10) * 10  # Ensure height is rounded to nearest 10
+    # Calculate bounding box dimensions, 20% margin rounded up to the next 10
+    bbox = (np.ceil(dimensions.astype(np.float64) * 1.2 / 10) * 10).astype(int)
+    length_width = max(bbox[0], bbox[1])  # Ensure length and width are the same
+    height = bbox[2]
 
     return min_coords, max_coords, dimensions, length_width, length_width, height
 
 
-def scale_model(model_mesh, scale_factor, output_filename):
+def scale_model(model_mesh, scale_factor, output_filename, min_coords=None, max_coords=None, block_size=1 << 12):
     """ Scale the STL model, center it at the origin, and save the new file. 
+    The min/max coordinates of the unscaled model can be passed in when already known.
     """
 
-    # Apply scaling factor
-    model_mesh.vectors *= scale_factor
+    # Calculate the center of the scaled model from the unscaled bounds
+    if min_coords is None or max_coords is None:
+        vertices = model_mesh.vectors.reshape(-1, 3)
+        min_coords, max_coords = vertices.min(axis=0), vertices.max(axis=0)
+    center = (min_coords * scale_factor + max_coords * scale_factor) / 2
 
-    # Calculate the center of the model
-    vertices = model_mesh.vectors.reshape(-1, 3)  # Extract all vertex coordinates
-    min_coords = np.min(vertices, axis=0)
-    max_coords = np.max(vertices, axis=0)
-    center = (min_coords + max_coords) / 2
-
-    # Move the model to center at the origin
-    translation = -center
-    model_mesh.vectors += translation
+    # Apply scaling factor and move the model to center at the origin,
+    # both on the same block of triangles while it is in cache
+    vectors = model_mesh.vectors
+    for start in range(0, len(vectors), block_size):
+        block = vectors[start:start + block_size]
+        block *= scale_factor
+        block -= center
 
     # Save the scaled and centered model
     os.makedirs(os.path.dirname(output_filename), exist_ok=True)  # Ensure directory exists
@@ -72,13 +87,11 @@ def plot_stl_3d(stl_file, title='3D Plot', save_as=''):
     fig = plt.figure()
     ax = fig.add_subplot(111, projection='3d')
     
-    # Plot each triangle
-    for f in model_mesh.vectors:
-        tri = Poly3DCollection([f], alpha=0.5, linewidths=0.5)
-        ax.add_collection3d(tri)
+    # Plot all triangles as one collection
+    ax.add_collection3d(Poly3DCollection(model_mesh.vectors, alpha=0.5, linewidths=0.5))
     
-    # Auto scale to the mesh size
-    scale = model_mesh.vectors.flatten()
+    # Auto scale to the mesh size, same limits on every axis
+    scale = [model_mesh.vectors.min(), model_mesh.vectors.max()]
     ax.auto_scale_xyz(scale, scale, scale)
     
     ax.set_title(title)
@@ -87,8 +100,8 @@ def plot_stl_3d(stl_file, title='3D Plot', save_as=''):
     else:
         plt.show()  # Show the plot
 
-def zoom_stl(stl_file, scale_factor):
-    """ Work with STL files: calculate dimensions, scale models, draw models 
+def process_stl(stl_file, scale_factor):
+    """ Read, measure, scale and save one STL file; return its STLDims and details text 
     """
     
     # Read STL file
@@ -106,11 +119,10 @@ def zoom_stl(stl_file, scale_factor):
 
     # Scale model
     new_stl_file = stl_file[:-4] + f'_zoom{scale_factor}.stl'
-    scale_model(model_mesh, scale_factor, new_stl_file)
+    scale_model(model_mesh, scale_factor, new_stl_file, min_coords1, max_coords1)
 
-    # Dimensions after scaling
-    new_model_mesh = mesh.Mesh.from_file(new_stl_file)
-    min_coords2, max_coords2, dimensions2, length2, width2, height2 = calc_dims(new_model_mesh)
+    # Dimensions after scaling (model_mesh was scaled in place)
+    min_coords2, max_coords2, dimensions2, length2, width2, height2 = calc_dims(model_mesh)
     scaled_details = (
         f'*******************************************************************\n'
         f'Scale_factor: {scale_factor}\n'
@@ -121,14 +133,36 @@ def zoom_stl(stl_file, scale_factor):
         f'Bounding box (LxWxH): {length2} x {width2} x {height2}\n'
     )
 
+    return (STLDims(dimensions1, np.array([length1, width1, height1]), stl_file),
+            STLDims(dimensions2, np.array([length2, width2, height2]), new_stl_file),
+            original_details + scaled_details)
+
+
+def zoom_stl(stl_file, scale_factor):
+    """ Work with STL files: calculate dimensions, scale models, draw models 
+    """
+    original, scaled, details = process_stl(stl_file, scale_factor)
+
     # Save details to stl_details.txt
     details_filename = os.path.join('model', 'stl_details.txt')
     with open(details_filename, 'w') as f:
-        f.write(original_details)
-        f.write(scaled_details)
+        f.write(details)
+
+    return original, scaled
+
 
+def batch_zoom(stl_files, scale_factor, max_workers=None):
+    """ Zoom several STL files in parallel, one worker process per file 
+    """
+    with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+        results = list(executor.map(process_stl, stl_files, repeat(scale_factor)))
+
+    # Workers only return their details, so stl_details.txt is written once here
+    details_filename = os.path.join('model', 'stl_details.txt')
+    with open(details_filename, 'w') as f:
+        f.write(''.join(details for _, _, details in results))
 
-    return (dimensions1, length1, width1, height1), (dimensions2, length2, width2, height2), new_stl_file
+    return [(original, scaled) for original, scaled, _ in results]
 
 
 def main():
@@ -136,13 +170,13 @@ def main():
     stl_file = './model/Phobos.stl'  
     scale_factor = 1.5  
 
-    original_dims, scaled_dims, new_stl_file = zoom_stl(stl_file, scale_factor)
+    original, scaled = zoom_stl(stl_file, scale_factor)
 
-    print("Original Dimensions (LxWxH):", original_dims)
-    print("Scaled Dimensions (LxWxH):", scaled_dims)
+    print("Original Dimensions (LxWxH):", original.dims, original.bbox)
+    print("Scaled Dimensions (LxWxH):", scaled.dims, scaled.bbox)
 
-    plot_stl_3d(stl_file, title='Original STL', save_as=os.path.join('model', 'original_stl.png'))
-    plot_stl_3d(new_stl_file, title='Scaled STL', save_as=os.path.join('model', 'scaled_stl.png'))
+    plot_stl_3d(original.path, title='Original STL', save_as=os.path.join('model', 'original_stl.png'))
+    plot_stl_3d(scaled.path, title='Scaled STL', save_as=os.path.join('model', 'scaled_stl.png'))
 
 if __name__ == "__main__":
     main()